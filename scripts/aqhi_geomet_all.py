@@ -9,22 +9,59 @@ Usage:
 
 Optional filters:
   python scripts/aqhi_geomet_all.py --bbox -121 48 -108 61
+
+Compressed GeoJSON (static hosts must serve it with Content-Encoding: gzip):
+  python scripts/aqhi_geomet_all.py --gzip-geojson
+
+Faster CSV writing via pyarrow (output is quoted differently from the published pandas CSVs):
+  python scripts/aqhi_geomet_all.py --arrow-csv
+
+GeoJSON via geopandas/GDAL (slower; formatted differently from the published files):
+  python scripts/aqhi_geomet_all.py --gdal-geojson
 """
 
-import argparse, json, sys
+import argparse, gzip, json, sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     import folium
 except ImportError:
     folium = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import geopandas as gpd
+except ImportError:
+    gpd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
 OBS_API = "https://api.weather.gc.ca/collections/aqhi-observations-realtime/items"
 FCST_API = "https://api.weather.gc.ca/collections/aqhi-forecasts-realtime/items"
+# columns published in the GeoJSON / NDJSON outputs
+OBS_GEO_COLUMNS = ["id","name","province","aqhi","observed","observation_datetime_text_en","color","lat","lon"]
+FCST_GEO_COLUMNS = ["id","name","province","forecast_datetime","forecast_datetime_text_en","publication_datetime_text_en","publication_datetime",
+                    "p1_label","p1_aqhi","p2_label","p2_aqhi","p3_label","p3_aqhi",
+                    "p4_label","p4_aqhi","p5_label","p5_aqhi","p1_color","lat","lon"]
+# forecast_period sub-objects unpacked into p1..p5 columns
+PERIOD_KEYS = ("period_1", "period_2", "period_3", "period_4", "period_5")
 
 # 11-color AQHI palette (1..10, 10+); grey for missing
 AQHI_COLORS = [
@@ -32,132 +69,298 @@ AQHI_COLORS = [
     "#fd6866", "#fe0002", "#cc0001", "#9a0100", "#640100"
 ]
 MISSING_COLOR = "#9e9e9e"
+# palette as an array; last slot is the missing color
+_PALETTE = np.array(AQHI_COLORS + [MISSING_COLOR], dtype=object)
+_AQHI_BINS = np.arange(1, 11, dtype=float)
+
+# shared session: keep-alive + pooled connections across pages and collections
+SESSION = requests.Session()
+# retries cover dropped connections and throttling / transient 5xx on the same pooled connection
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                                      max_retries=Retry(total=3, backoff_factor=0.3,
+                                                        status_forcelist=(429, 500, 502, 503, 504),
+                                                        raise_on_status=False)))
+# ask for (compressed) GeoJSON explicitly; requests already negotiates gzip/deflate and decodes it
+SESSION.headers.update({"Accept": "application/geo+json, application/json"})
+
+# np.digitize bins ~30k rows in about a millisecond; numba's import + compile (~0.6 s) only
+# pays off on columns of this many rows or more
+_NUMBA_MIN_ROWS = 25_000_000
 
-def aqhi_to_color(val):
-    if val is None or pd.isna(val):
-        return MISSING_COLOR
+@lru_cache(maxsize=None)
+def _aqhi_bin_jit():
+    """numba ufunc for the palette index, imported and compiled on first use (None without numba)."""
     try:
-        v = float(val)
-    except Exception:
-        return MISSING_COLOR
-    if v <= 1:  return AQHI_COLORS[0]
-    if v <= 2:  return AQHI_COLORS[1]
-    if v <= 3:  return AQHI_COLORS[2]
-    if v <= 4:  return AQHI_COLORS[3]
-    if v <= 5:  return AQHI_COLORS[4]
-    if v <= 6:  return AQHI_COLORS[5]
-    if v <= 7:  return AQHI_COLORS[6]
-    if v <= 8:  return AQHI_COLORS[7]
-    if v <= 9:  return AQHI_COLORS[8]
-    if v <= 10: return AQHI_COLORS[9]
-    return AQHI_COLORS[10]
-
-def fetch_all_items(api_url: str, bbox: Optional[List[float]] = None) -> List[Dict[str, Any]]:
-    """Generic pager for GeoMet OGC API collections."""
-    items = []
+        import numba
+    except ImportError:
+        return None
+
+    @numba.vectorize(["int8(float64)"], nopython=True)
+    def _aqhi_bin(v):
+        # palette index: 0..10 for the AQHI bins, 11 for missing
+        if np.isnan(v):
+            return 11
+        for i in range(10):
+            if v <= i + 1:
+                return i
+        return 10
+    return _aqhi_bin
+
+def aqhi_to_color_vec(series: pd.Series) -> pd.Categorical:
+    """AQHI → palette color for a whole column (right-closed bins; categorical over the palette)."""
+    v = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    jit = _aqhi_bin_jit() if len(v) >= _NUMBA_MIN_ROWS else None
+    if jit is not None:
+        idx = jit(v)
+    else:
+        idx = np.digitize(v, _AQHI_BINS, right=True)
+        idx[np.isnan(v)] = len(_PALETTE) - 1
+    # bin indices are the category codes directly; no per-row string handling
+    return pd.Categorical.from_codes(idx, categories=_PALETTE)
+
+def _get_page(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    r = SESSION.get(url, params=params, timeout=60)
+    r.raise_for_status()
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+def _next_link(data: Dict[str, Any]) -> Optional[str]:
+    for link in data.get("links", []):
+        if link.get("rel") == "next" and link.get("href"):
+            return link["href"]
+    return None
+
+def _iter_pages(api_url: str, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    first = _get_page(api_url, params)
+    yield first
+    matched = first.get("numberMatched")
+    step = first.get("numberReturned") or len(first.get("features", []))
+    if matched is not None and step:
+        # total is known: fetch the remaining offsets in parallel (yielded in order)
+        def _page_at(offset):
+            return _get_page(api_url, {**params, "limit": step, "offset": offset})
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            yield from ex.map(_page_at, range(step, matched, step))
+        return
+    # otherwise follow rel=next links, prefetching one page ahead
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        next_url = _next_link(first)
+        fut = ex.submit(_get_page, next_url) if next_url else None
+        while fut is not None:
+            data = fut.result()
+            next_url = _next_link(data)
+            fut = ex.submit(_get_page, next_url) if next_url else None
+            yield data
+
+def _latest_per_id(features: Iterable[Dict[str, Any]], ts_key: str) -> List[Dict[str, Any]]:
+    # ISO-8601 UTC strings order lexicographically. Features without an id or without
+    # coordinates are skipped (the frame builders would drop them anyway), so they can't
+    # displace an older, mappable record for the same id.
+    latest: Dict[Any, tuple] = {}
+    for f in features:
+        p = f.get("properties", {})
+        k = p.get("id") or p.get("location_id")
+        if k is None:
+            continue
+        coords = (f.get("geometry") or {}).get("coordinates") or (None, None)
+        if coords[0] is None or coords[1] is None:
+            continue
+        ts = p.get(ts_key) or ""
+        cur = latest.get(k)
+        if cur is None or ts > cur[0]:
+            latest[k] = (ts, f)
+    return [f for _, f in latest.values()]
+
+def fetch_all_items(api_url: str, bbox: Optional[List[float]] = None,
+                    latest_by: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Generic pager for GeoMet OGC API collections (yields features; pages fetched concurrently).
+
+    With latest_by, only the latest feature per id (properties.id, else location_id) is kept,
+    compared on that datetime property. In that mode features with no id or without both
+    coordinates are dropped, so one can't shadow an older, mappable record for the same id.
+    """
     params = {"f": "json", "limit": 1000}
     if bbox:
         params["bbox"] = ",".join(map(str, bbox))
-    url = api_url
-    while url:
-        r = requests.get(url, params=params if url == api_url else None, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-        items.extend(data.get("features", []))
-        # find next link (if any)
-        next_url = None
-        for link in data.get("links", []):
-            if link.get("rel") == "next" and link.get("href"):
-                next_url = link["href"]
-                break
-        url = next_url
-        params = None
-    return items
-
-def obs_to_df(features: List[Dict[str, Any]]) -> pd.DataFrame:
-    rows = []
+    features = (f for page in _iter_pages(api_url, params) for f in page.get("features", []))
+    if latest_by:
+        yield from _latest_per_id(features, latest_by)
+        return
+    seen = set()  # pages fetched at slightly different times can overlap
+    for f in features:
+        fid = f.get("id")
+        if fid is not None:
+            if fid in seen:
+                continue
+            seen.add(fid)
+        yield f
+
+def _clip_bbox(df: pd.DataFrame, bbox: Optional[List[float]]) -> pd.DataFrame:
+    # one vectorized mask over the raw coordinate arrays
+    if not bbox:
+        return df
+    W, S, E, N = bbox
+    lon = df["lon"].to_numpy(dtype=float)
+    lat = df["lat"].to_numpy(dtype=float)
+    return df[(lon >= W) & (lon <= E) & (lat >= S) & (lat <= N)]
+
+def obs_to_df(features: Iterable[Dict[str, Any]], bbox: Optional[List[float]] = None) -> pd.DataFrame:
+    # fill one list per column, then build the frame column-wise
+    ids, names, provs, aqhis, observed = [], [], [], [], []
+    text_en, text_fr, lons, lats = [], [], [], []
     for f in features:
         p = f.get("properties", {})
         g = f.get("geometry", {}) or {}
-        coords = g.get("coordinates") or [None, None]
-        rows.append({
-            "id": p.get("id") or p.get("location_id"),
-            "name": p.get("location_name_en") or p.get("location_name_fr"),
-            "province": p.get("province"),
-            "aqhi": p.get("aqhi"),
-            "observed": p.get("observation_datetime"),
-            "observation_datetime_text_en": p.get("observation_datetime_text_en"),
-            "observation_datetime_text_fr": p.get("observation_datetime_text_fr"),
-            "lon": coords[0],
-            "lat": coords[1],
-        })
-    df = pd.DataFrame(rows).dropna(subset=["lat","lon"])
-    if not df.empty and "observed" in df.columns:
-        df = df.sort_values("observed").groupby("id", as_index=False).tail(1)
-    df["color"] = df["aqhi"].apply(aqhi_to_color)
+        coords = g.get("coordinates") or (None, None)
+        ids.append(p.get("id") or p.get("location_id"))
+        names.append(p.get("location_name_en") or p.get("location_name_fr"))
+        provs.append(p.get("province"))
+        aqhis.append(p.get("aqhi"))
+        observed.append(p.get("observation_datetime"))
+        text_en.append(p.get("observation_datetime_text_en"))
+        text_fr.append(p.get("observation_datetime_text_fr"))
+        lons.append(coords[0])
+        lats.append(coords[1])
+    df = pd.DataFrame({
+        "id": ids,
+        "name": names,
+        "province": provs,
+        "aqhi": aqhis,
+        "observed": observed,
+        "observation_datetime_text_en": text_en,
+        "observation_datetime_text_fr": text_fr,
+        "lon": lons,
+        "lat": lats,
+    }).dropna(subset=["lat","lon"])
+    df = _clip_bbox(df, bbox)
+    df = df.assign(province=df["province"].astype("category"))
+    df["color"] = aqhi_to_color_vec(df["aqhi"])
     return df
 
-def fcst_to_df(features: List[Dict[str, Any]]) -> pd.DataFrame:
-    rows = []
+def fcst_to_df(features: Iterable[Dict[str, Any]], bbox: Optional[List[float]] = None) -> pd.DataFrame:
+    ids, names, provs, fcst_dt, pub_dt = [], [], [], [], []
+    fcst_en, fcst_fr, pub_en, pub_fr, lons, lats = [], [], [], [], [], []
+    p_labels = tuple([] for _ in PERIOD_KEYS)
+    p_aqhis = tuple([] for _ in PERIOD_KEYS)
     for f in features:
-      
         p = f.get("properties", {})
         g = f.get("geometry", {}) or {}
-        coords = g.get("coordinates") or [None, None]
-        fp = p.get("forecast_period", {}) or {}
-        def getp(n):
-            d = fp.get(f"period_{n}", {}) or {}
-            return d.get("aqhi"), d.get("forecast_period_en") or d.get("forecast_period_fr")
-        p1_aqhi, p1_label = getp(1)
-        p2_aqhi, p2_label = getp(2)
-        p3_aqhi, p3_label = getp(3)
-        p4_aqhi, p4_label = getp(4)
-        p5_aqhi, p5_label = getp(5)
-        rows.append({
-            "id": p.get("id") or p.get("location_id"),
-            "name": p.get("location_name_en") or p.get("location_name_fr"),
-            "province": p.get("province"),
-            "forecast_datetime": p.get("forecast_datetime"),
-            "publication_datetime": p.get("publication_datetime"),
-            "forecast_datetime_text_en": p.get("forecast_datetime_text_en"),
-            "forecast_datetime_text_fr": p.get("forecast_datetime_text_fr"),
-            "publication_datetime_text_en": p.get("publication_datetime_text_en"),
-            "publication_datetime_text_fr": p.get("publication_datetime_text_fr"),         
-            "p1_label": p1_label,
-            "p1_aqhi": p1_aqhi,
-            "p2_label": p2_label,
-            "p2_aqhi": p2_aqhi,
-            "p3_label": p3_label,
-            "p3_aqhi": p3_aqhi,
-            "p4_label": p4_label,
-            "p4_aqhi": p4_aqhi,
-            "p5_label": p5_label,
-            "p5_aqhi": p5_aqhi,
-            "lon": coords[0],
-            "lat": coords[1],
-        })
-    df = pd.DataFrame(rows).dropna(subset=["lat","lon"])
-    if not df.empty and "forecast_datetime" in df.columns:
-        df = df.sort_values("forecast_datetime").groupby("id", as_index=False).tail(1)
+        coords = g.get("coordinates") or (None, None)
+        fp = p.get("forecast_period") or {}
+        ids.append(p.get("id") or p.get("location_id"))
+        names.append(p.get("location_name_en") or p.get("location_name_fr"))
+        provs.append(p.get("province"))
+        fcst_dt.append(p.get("forecast_datetime"))
+        pub_dt.append(p.get("publication_datetime"))
+        fcst_en.append(p.get("forecast_datetime_text_en"))
+        fcst_fr.append(p.get("forecast_datetime_text_fr"))
+        pub_en.append(p.get("publication_datetime_text_en"))
+        pub_fr.append(p.get("publication_datetime_text_fr"))
+        for key, aqhi_col, label_col in zip(PERIOD_KEYS, p_aqhis, p_labels):
+            d = fp.get(key) or {}
+            aqhi_col.append(d.get("aqhi"))
+            label_col.append(d.get("forecast_period_en") or d.get("forecast_period_fr"))
+        lons.append(coords[0])
+        lats.append(coords[1])
+    cols = {
+        "id": ids,
+        "name": names,
+        "province": provs,
+        "forecast_datetime": fcst_dt,
+        "publication_datetime": pub_dt,
+        "forecast_datetime_text_en": fcst_en,
+        "forecast_datetime_text_fr": fcst_fr,
+        "publication_datetime_text_en": pub_en,
+        "publication_datetime_text_fr": pub_fr,
+    }
+    for n, (label_col, aqhi_col) in enumerate(zip(p_labels, p_aqhis), start=1):
+        cols[f"p{n}_label"] = label_col
+        cols[f"p{n}_aqhi"] = aqhi_col
+    cols["lon"] = lons
+    cols["lat"] = lats
+    df = pd.DataFrame(cols).dropna(subset=["lat","lon"])
+    df = _clip_bbox(df, bbox)
+    df = df.assign(province=df["province"].astype("category"))
     # color first forecast period
-    df["p1_color"] = df["p1_aqhi"].apply(aqhi_to_color)
+    df["p1_color"] = aqhi_to_color_vec(df["p1_aqhi"])
     return df
 
-def df_to_geojson(df: pd.DataFrame) -> Dict[str, Any]:
-    feats = []
-    for _, r in df.iterrows():
-        props = {k: (None if pd.isna(r[k]) else r[k]) for k in df.columns if k not in ("lat","lon")}
-        feats.append({
+def iter_features(df: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    # one NaN->None pass per column, then zip the raw arrays (no pandas per row)
+    keys = [k for k in df.columns if k not in ("lat","lon")]
+    cols = [df[k].astype(object).where(df[k].notna(), None).to_numpy() for k in keys]
+    for lo, la, *vals in zip(df["lon"].to_numpy(), df["lat"].to_numpy(), *cols):
+        yield {
             "type": "Feature",
-            "geometry": {"type": "Point", "coordinates": [float(r["lon"]), float(r["lat"])]},
-            "properties": props
-        })
-    return {"type": "FeatureCollection", "features": feats}
+            "geometry": {"type": "Point", "coordinates": [float(lo), float(la)]},
+            "properties": dict(zip(keys, vals))
+        }
+
+def df_to_geojson(df: pd.DataFrame) -> Dict[str, Any]:
+    return {"type": "FeatureCollection", "features": list(iter_features(df))}
 
-def save_geojson(obj: Dict[str, Any], path: Path):
+def write_csv(df: pd.DataFrame, path: Path, use_arrow: bool = False):
+    # pandas' format is the published one; pyarrow (opt-in) quotes every string and writes 53 for 53.0
+    if use_arrow and pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            table = None  # mixed-type object column; let pandas handle it
+        if table is not None:
+            pacsv.write_csv(table, str(path), pacsv.WriteOptions(quoting_style="needed"))
+            return
+    df.to_csv(path, index=False)
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def _open_out(path: Path, compresslevel: int = 9):
+    """Binary output stream; gzip when path ends in .gz (mtime=0 so unchanged data gives identical bytes)."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False)
+    if path.suffix == ".gz":
+        return gzip.GzipFile(path, "wb", compresslevel=compresslevel, mtime=0)
+    return path.open("wb")
+
+def save_geojson(df: pd.DataFrame, path: Path):
+    """FeatureCollection written feature by feature (the full dict is never built)."""
+    # level 1: near-memcpy speed, still shrinks the repetitive GeoJSON text several-fold
+    with _open_out(path, compresslevel=1) as f:
+        f.write(b'{"type":"FeatureCollection","features":[')
+        for i, feat in enumerate(iter_features(df)):
+            if i:
+                f.write(b",")
+            f.write(_dumps(feat))
+        f.write(b"]}")
+
+def save_ndjson(df: pd.DataFrame, path: Path):
+    """One GeoJSON feature per line, written incrementally (gzipped if path ends in .gz)."""
+    # level 1 as in save_geojson: these are rewritten every run, level 9 costs ~1.7x the time
+    with _open_out(path, compresslevel=1) as f:
+        for feat in iter_features(df):
+            f.write(_dumps(feat) + b"\n")
+
+def write_geojson(df: pd.DataFrame, path: Path, use_gdal: bool = False):
+    """Write a lat/lon frame as a Point FeatureCollection (streamed; geopandas/GDAL opt-in)."""
+    # GDAL is slower, can't stream, and adds name/crs members, indentation and 15-digit coordinates
+    if use_gdal and gpd is not None and path.suffix != ".gz":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        gdf = gpd.GeoDataFrame(df.drop(columns=["lat","lon"]),
+                               geometry=gpd.points_from_xy(df["lon"], df["lat"]), crs="EPSG:4326")
+        gdf.to_file(path, driver="GeoJSON")
+        return
+    save_geojson(df, path)
+
+def _geojson_layer(df: pd.DataFrame, colors, popups: List[str], name: str, show: bool):
+    # one GeoJson layer per dataset: markers, colors and popups all come from feature properties
+    data = df_to_geojson(df[["lat","lon"]].assign(color=np.asarray(colors), popup=popups))
+    return folium.GeoJson(
+        data, name=name, show=show,
+        marker=folium.CircleMarker(radius=6, weight=1, fill=True, fill_opacity=0.9),
+        style_function=lambda feat: {"color": feat["properties"]["color"],
+                                     "fillColor": feat["properties"]["color"]},
+        popup=folium.GeoJsonPopup(fields=["popup"], labels=False, localize=False),
+    )
 
 def build_map(obs_df: pd.DataFrame, fcst_df: pd.DataFrame, out_html: Path):
     if folium is None:
@@ -176,34 +379,19 @@ def build_map(obs_df: pd.DataFrame, fcst_df: pd.DataFrame, out_html: Path):
     # Observations layer
     obs_layer = None
     if not obs_df.empty:
-        def _obspt(r):
-            color = r.get("color", MISSING_COLOR)
-            return dict(radius=6, color=color, weight=1, fill=True, fillColor=color, fillOpacity=0.9)
-        obs_layer = folium.FeatureGroup(name="AQHI (observed)", show=True)
-        for _, r in obs_df.iterrows():
-            folium.CircleMarker(
-                [float(r["lat"]), float(r["lon"])],
-                popup=f"<b>{r.get('name','(unknown)')}</b><br>AQHI: {r.get('aqhi','—')}<br>{r.get('observed','')}",
-                **_obspt(r)
-            ).add_to(obs_layer)
+        popups = [f"<b>{n}</b><br>AQHI: {a}<br>{o}"
+                  for n, a, o in zip(obs_df["name"], obs_df["aqhi"], obs_df["observed"])]
+        obs_layer = _geojson_layer(obs_df, obs_df["color"], popups, name="AQHI (observed)", show=True)
         obs_layer.add_to(m)
 
     # Forecast layer (use p1)
     fcst_layer = None
     if not fcst_df.empty:
-        def _fcstpt(r):
-            color = r.get("p1_color", MISSING_COLOR)
-            return dict(radius=6, color=color, weight=1, fill=True, fillColor=color, fillOpacity=0.9)
-        fcst_layer = folium.FeatureGroup(name="AQHI (forecast: next period)", show=False)
-        for _, r in fcst_df.iterrows():
-            label = r.get("p1_label") or "Next period"
-            folium.CircleMarker(
-                [float(r["lat"]), float(r["lon"])],
-                popup=(f"<b>{r.get('name','(unknown)')}</b><br>"
-                       f"{label}: {r.get('p1_aqhi','—')}<br>"
-                       f"Issued: {r.get('publication_datetime','')}"),
-                **_fcstpt(r)
-            ).add_to(fcst_layer)
+        popups = [f"<b>{n}</b><br>{label or 'Next period'}: {a}<br>Issued: {pub}"
+                  for n, label, a, pub in zip(fcst_df["name"], fcst_df["p1_label"],
+                                              fcst_df["p1_aqhi"], fcst_df["publication_datetime"])]
+        fcst_layer = _geojson_layer(fcst_df, fcst_df["p1_color"], popups,
+                                    name="AQHI (forecast: next period)", show=False)
         fcst_layer.add_to(m)
 
     folium.LayerControl(collapsed=False).add_to(m)
@@ -228,42 +416,50 @@ def main():
     ap.add_argument("--bbox", nargs=4, type=float, default=None, help="W S E N (optional)")
     ap.add_argument("--out-dir", default="data", help="Output directory")
     ap.add_argument("--html", default=None, help="Optional HTML map output path, e.g., data/index.html")
+    ap.add_argument("--arrow-csv", action="store_true",
+                    help="Write CSVs with pyarrow (faster; quotes all strings, no trailing .0 on floats)")
+    ap.add_argument("--gdal-geojson", action="store_true",
+                    help="Write GeoJSON with geopandas/GDAL (output differs from the published files)")
+    ap.add_argument("--gzip-geojson", action="store_true",
+                    help="Write .geojson.gz instead of .geojson (serve with Content-Encoding: gzip)")
     args = ap.parse_args()
 
     out_dir = Path(args.out_dir); out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Fetch
-    obs_feats = fetch_all_items(OBS_API, bbox=args.bbox)
-    fcst_feats = fetch_all_items(FCST_API, bbox=args.bbox)
-
-    # DataFrames
-    obs_df = obs_to_df(obs_feats)
-    fcst_df = fcst_to_df(fcst_feats)
-
-    # Optional extra bbox filter (if not used upstream)
-    if args.bbox:
-        W,S,E,N = args.bbox
-        obs_df = obs_df[(obs_df["lon"]>=W)&(obs_df["lon"]<=E)&(obs_df["lat"]>=S)&(obs_df["lat"]<=N)]
-        fcst_df = fcst_df[(fcst_df["lon"]>=W)&(fcst_df["lon"]<=E)&(fcst_df["lat"]>=S)&(fcst_df["lat"]<=N)]
+    # Fetch + build DataFrames (both collections concurrently; latest record per id kept while paging)
+    obs_feats = fetch_all_items(OBS_API, bbox=args.bbox, latest_by="observation_datetime")
+    fcst_feats = fetch_all_items(FCST_API, bbox=args.bbox, latest_by="forecast_datetime")
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        obs_fut = ex.submit(obs_to_df, obs_feats, bbox=args.bbox)
+        fcst_fut = ex.submit(fcst_to_df, fcst_feats, bbox=args.bbox)
+        obs_df = obs_fut.result()
+        fcst_df = fcst_fut.result()
 
     # Write CSV
     obs_csv = out_dir / "aqhi_observations.csv"
     fcst_csv = out_dir / "aqhi_forecasts.csv"
-    obs_df.to_csv(obs_csv, index=False)
-    fcst_df.to_csv(fcst_csv, index=False)
+    write_csv(obs_df, obs_csv, use_arrow=args.arrow_csv)
+    write_csv(fcst_df, fcst_csv, use_arrow=args.arrow_csv)
     print(f"Wrote {obs_csv} ({len(obs_df)} rows)")
     print(f"Wrote {fcst_csv} ({len(fcst_df)} rows)")
 
     # Write GeoJSON
-    obs_geo = out_dir / "aqhi_observations.geojson"
-    fcst_geo = out_dir / "aqhi_forecasts.geojson"
-    save_geojson(df_to_geojson(obs_df[["id","name","province","aqhi","observed","observation_datetime_text_en","color","lat","lon"]]), obs_geo)
-    save_geojson(df_to_geojson(fcst_df[["id","name","province","forecast_datetime","forecast_datetime_text_en","publication_datetime_text_en","publication_datetime",
-                                        "p1_label","p1_aqhi","p2_label","p2_aqhi","p3_label","p3_aqhi",
-                                        "p4_label","p4_aqhi","p5_label","p5_aqhi","p1_color","lat","lon"]]), fcst_geo)
+    geo_ext = ".geojson.gz" if args.gzip_geojson else ".geojson"
+    obs_geo = out_dir / f"aqhi_observations{geo_ext}"
+    fcst_geo = out_dir / f"aqhi_forecasts{geo_ext}"
+    write_geojson(obs_df[OBS_GEO_COLUMNS], obs_geo, use_gdal=args.gdal_geojson)
+    write_geojson(fcst_df[FCST_GEO_COLUMNS], fcst_geo, use_gdal=args.gdal_geojson)
     print(f"Wrote {obs_geo}")
     print(f"Wrote {fcst_geo}")
 
+    # NDJSON sidecars (one feature per line) for incremental consumers
+    obs_nd = out_dir / "aqhi_observations.ndjson.gz"
+    fcst_nd = out_dir / "aqhi_forecasts.ndjson.gz"
+    save_ndjson(obs_df[OBS_GEO_COLUMNS], obs_nd)
+    save_ndjson(fcst_df[FCST_GEO_COLUMNS], fcst_nd)
+    print(f"Wrote {obs_nd}")
+    print(f"Wrote {fcst_nd}")
+
     # Optional HTML map
     if args.html:
         build_map(obs_df, fcst_df, Path(args.html))